@@ -0,0 +1,207 @@
+# Importing required libraries
+import contextlib
+import functools
+import glob
+import inspect
+import io
+import os
+import pickle
+import random
+import time
+import zlib
+
+import numpy as np
+
+# Bumped whenever the layout of the checkpoint payload changes
+CHECKPOINT_VERSION = 1
+
+# NumPy generators a model may own next to model.random: BoltzmannWealthArray.generator, mesa 3's Model.rng
+NUMPY_RNG_ATTRIBUTES = ["generator", "rng"]
+
+
+# Mesa's DataCollector turns attribute-string and [function, params] reporters into local closures,
+# which pickle cannot handle. They are saved as partials of these module-level equivalents instead.
+def agent_attribute(attribute_name, agent):
+    return getattr(agent, attribute_name, None)
+
+def call_with_params(func, params, agent):
+    return func(agent, *params)
+
+class ModelPickler(pickle.Pickler):
+    """Pickler that can also save the reporter closures created by mesa's DataCollector."""
+    def reducer_override(self, obj):
+        if inspect.isfunction(obj) and obj.__module__ == "mesa.datacollection":
+            qualname = getattr(obj, "__qualname__", "")
+            cells = dict(zip(obj.__code__.co_freevars, (cell.cell_contents for cell in obj.__closure__ or ())))
+            if qualname.endswith("<locals>.attr_reporter"):
+                return functools.partial, (agent_attribute, cells["attribute_name"])
+            if qualname.endswith("<locals>.func_with_params"):
+                return functools.partial, (call_with_params, cells["func"], cells["params"])
+        return NotImplemented
+
+
+def save_checkpoint(model, file_path, step=None, level=6):
+    """
+    Saves a snapshot of a model to a compact binary file (pickle, compressed with zlib).
+    The snapshot holds the whole model object graph: agents, grid, schedule, the model's own RNG, the data collector
+    and (for the task model) the workload stream. The global `random` state is stored too, for code that uses it.
+    The file is written to a temporary path first and then renamed, so a crash while saving never corrupts a checkpoint.
+    """
+    payload = {
+        "version": CHECKPOINT_VERSION,
+        "step": step,
+        "model": model,
+        "global_random_state": random.getstate(),
+    }
+    buffer = io.BytesIO()
+    ModelPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(payload)
+    data = zlib.compress(buffer.getvalue(), level)
+
+    temp_path = file_path + ".tmp"
+    with open(temp_path, "wb") as file:
+        file.write(data)
+    os.replace(temp_path, file_path)
+    return len(data)
+
+
+def load_checkpoint(file_path, restore_global_random=True):
+    """
+    Restores a model saved by save_checkpoint and returns it together with the step it was saved at.
+    The model classes must be importable under the same names as when the checkpoint was saved.
+    """
+    with open(file_path, "rb") as file:
+        payload = pickle.loads(zlib.decompress(file.read()))
+
+    if payload["version"] != CHECKPOINT_VERSION:
+        raise ValueError(f"Checkpoint version {payload['version']} is not supported (expected {CHECKPOINT_VERSION}).")
+
+    if restore_global_random:
+        random.setstate(payload["global_random_state"])
+    return payload["model"], payload["step"]
+
+
+def reseed_model(model, seed):
+    """
+    Reseeds every RNG the model owns: model.random and any NumPy generator in NUMPY_RNG_ATTRIBUTES.
+    Generators are reseeded in place, so agents or spaces holding a reference to them follow along.
+    """
+    model.random.seed(seed)
+    for attribute in NUMPY_RNG_ATTRIBUTES:
+        generator = getattr(model, attribute, None)
+        if isinstance(generator, np.random.Generator):
+            generator.bit_generator.state = type(generator.bit_generator)(seed).state
+
+
+def fork_checkpoint(file_path, seeds):
+    """
+    Creates one independent copy of a saved model per seed, for what-if branches.
+    Each branch's RNGs are reseeded, so the branches diverge from the saved state instead of replaying it.
+    """
+    branches = []
+    for seed in seeds:
+        model, step = load_checkpoint(file_path, restore_global_random=False)
+        reseed_model(model, seed)
+        branches.append((model, step))
+    return branches
+
+
+class Checkpointer:
+    """Saves a model every `interval` steps into a directory, keeping the `keep` newest checkpoints (None keeps all)."""
+    def __init__(self, directory, interval=100, keep=3, level=6):
+        if interval < 1:
+            raise ValueError(f"interval must be at least 1 step, got {interval}.")
+        if keep is not None and keep < 1:
+            raise ValueError(f"keep must be at least 1 (or None to keep every checkpoint), got {keep}.")
+        self.directory = directory
+        self.interval = interval
+        self.keep = keep
+        self.level = level
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, step):
+        return os.path.join(self.directory, f"checkpoint_{step:09d}.ckpt")
+
+    def checkpoints(self):
+        """Lists the saved checkpoints, oldest first."""
+        return sorted(glob.glob(os.path.join(self.directory, "checkpoint_*.ckpt")))
+
+    def save(self, model, step):
+        save_checkpoint(model, self.path_for(step), step=step, level=self.level)
+
+        # Remove the oldest checkpoints
+        if self.keep is not None:
+            for old_path in self.checkpoints()[:-self.keep]:
+                os.remove(old_path)
+
+    def run(self, model, num_steps, start_step=0):
+        """Steps the model up to num_steps, saving a checkpoint every `interval` steps."""
+        for step in range(start_step + 1, num_steps + 1):
+            model.step()
+            if step % self.interval == 0:
+                self.save(model, step)
+        return model
+
+    def resume(self, num_steps, make_model=None):
+        """
+        Continues a run from the newest checkpoint in the directory, up to num_steps.
+        If there is no checkpoint yet, a fresh model from make_model() is run from step 0.
+        """
+        saved = self.checkpoints()
+        if saved:
+            model, step = load_checkpoint(saved[-1])
+        elif make_model is None:
+            raise ValueError(f"No checkpoint in {self.directory} to resume from, and no make_model to start a new run.")
+        else:
+            model, step = make_model(), 0
+        return self.run(model, num_steps, start_step=step)
+
+
+def benchmark_checkpoints(make_model, sizes, warmup_steps=10, repeats=3):
+    """
+    Measures checkpoint size, save time and restore time as the model grows.
+    make_model(size) must return a model; it is stepped warmup_steps times before measuring.
+    """
+    results = []
+    file_path = "benchmark.ckpt"
+
+    for size in sizes:
+        # Some models print on every step, keep the benchmark output readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            model = make_model(size)
+            for _ in range(warmup_steps):
+                model.step()
+
+        start_time = time.perf_counter()
+        for _ in range(repeats):
+            num_bytes = save_checkpoint(model, file_path)
+        save_duration = (time.perf_counter() - start_time) / repeats
+
+        start_time = time.perf_counter()
+        for _ in range(repeats):
+            load_checkpoint(file_path)
+        load_duration = (time.perf_counter() - start_time) / repeats
+
+        results.append((size, num_bytes, save_duration, load_duration))
+        print(f"Size {size:>8}: {num_bytes / 1024:10.1f} KiB, save {save_duration:.4f} s, restore {load_duration:.4f} s")
+
+    os.remove(file_path)
+    return results
+
+
+# Benchmarking save and restore of the parking lot and task scheduling models
+if __name__ == "__main__":
+    from functools import partial
+    from task1 import ParkingLot
+    from task2 import CooperativeTaskModel
+    from workload import SyntheticWorkload
+
+    sizes = [10, 50, 100, 200]
+
+    print("Parking lot (size x size grid, size cars, size parking spaces, size // 2 trees):")
+    benchmark_checkpoints(lambda size: ParkingLot(size, size, size, size, size // 2), sizes)
+
+    print("\nCooperative task model (synthetic tasks arriving size per step, about 10 * size pending):")
+    benchmark_checkpoints(
+        lambda size: CooperativeTaskModel(10, 10, 3, workload=partial(SyntheticWorkload, None, 1, float(size))),
+        sizes,
+    )
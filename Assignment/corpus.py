@@ -0,0 +1,146 @@
+# Importing required libraries
+import glob
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from multiprocessing import Pool, cpu_count
+
+from task3 import map_function, combine_results
+
+# Files larger than this are split into pieces, so one big file does not keep a single process busy at the end
+PIECE_SIZE = 1024 * 1024 # Bytes
+
+ASCII_WHITESPACE = b" \t\n\r\x0b\x0c"
+
+# The book shipped with the repository, used to build a test corpus
+MOBY_DICK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Moby_dick", "pg2701.txt")
+
+
+# Finding the documents of a corpus, given either a directory (all .txt files in it, recursively) or a glob pattern
+def find_documents(corpus):
+    if os.path.isdir(corpus):
+        pattern = os.path.join(corpus, "**", "*.txt")
+    else:
+        pattern = corpus
+    return sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+
+# Moving a piece boundary forward to the next whitespace byte, so that no word is split between two pieces
+# (UTF-8 multi-byte characters never contain ASCII bytes, so this is also safe for non-ASCII text)
+def align_to_whitespace(file, position, size):
+    file.seek(position)
+    while position < size:
+        block = file.read(4096)
+        for i, byte in enumerate(block):
+            if byte in ASCII_WHITESPACE:
+                return position + i
+        position += len(block)
+    return size
+
+
+# Splitting every document into (path, start, end) pieces of about piece_size bytes
+def plan_pieces(paths, piece_size=PIECE_SIZE):
+    pieces = []
+    for path in paths:
+        size = os.path.getsize(path)
+        start = 0
+        with open(path, "rb") as file:
+            while start < size:
+                end = align_to_whitespace(file, start + piece_size, size) if start + piece_size < size else size
+                pieces.append((path, start, end))
+                start = end
+        if size == 0:
+            pieces.append((path, 0, 0))
+    return pieces
+
+
+# Map function for one piece of a document: read it, clean it and count its words
+def count_piece(piece):
+    path, start, end = piece
+    with open(path, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+    return path, map_function(data.decode("utf-8", errors="replace")), len(data)
+
+
+# Parallel corpus count with dynamic scheduling:
+# pieces are sorted largest first and handed out one at a time to whichever worker is idle (imap_unordered, chunksize 1),
+# so workers that get small files simply take more of them and the big pieces do not all end up at the back of the queue
+def parallel_corpus_count(paths, processes=None, piece_size=PIECE_SIZE):
+    pieces = sorted(plan_pieces(paths, piece_size), key=lambda piece: piece[2] - piece[1], reverse=True)
+    per_document = {path: {} for path in paths}
+    total_bytes = 0
+
+    with Pool(processes or cpu_count()) as pool:
+        for path, word_counts, num_bytes in pool.imap_unordered(count_piece, pieces, chunksize=1):
+            # Merged in place, so a file split into many pieces does not copy its running counts for every piece
+            document_counts = per_document[path]
+            for word, count in word_counts.items():
+                document_counts[word] = document_counts.get(word, 0) + count
+            total_bytes += num_bytes
+
+    return per_document, combine_results(per_document.values()), total_bytes
+
+
+# Single-process corpus count, one whole document at a time
+def serial_corpus_count(paths):
+    per_document = {}
+    total_bytes = 0
+
+    for path in paths:
+        with open(path, "rb") as file:
+            data = file.read()
+        per_document[path] = map_function(data.decode("utf-8", errors="replace"))
+        total_bytes += len(data)
+
+    return per_document, combine_results(per_document.values()), total_bytes
+
+
+# Building a test corpus from a source text: num_files documents with heavy-tailed sizes
+# (many small files, a few that are several times larger than the book) made of slices of the source
+def build_corpus(directory, num_files=200, source_path=MOBY_DICK, seed=1):
+    rng = random.Random(seed)
+    with open(source_path, "r", encoding="utf-8") as file:
+        lines = file.readlines()
+
+    os.makedirs(directory, exist_ok=True)
+    for i in range(num_files):
+        num_lines = min(int(20 * rng.paretovariate(0.6)), 5 * len(lines))
+        first = rng.randrange(len(lines))
+        with open(os.path.join(directory, f"doc_{i:04d}.txt"), "w", encoding="utf-8") as file:
+            for j in range(num_lines):
+                file.write(lines[(first + j) % len(lines)])
+    return directory
+
+
+# Throughput summary of a corpus run
+def report(label, paths, total_bytes, duration):
+    print(f"{label}: {len(paths)} files, {total_bytes / 1e6:.1f} MB in {duration:.3f} seconds "
+          f"({len(paths) / duration:.1f} files/s, {total_bytes / 1e6 / duration:.1f} MB/s)")
+
+
+# Counting a corpus (a directory or glob given on the command line, or a corpus generated from Moby Dick)
+if __name__ == "__main__":
+    generated = len(sys.argv) < 2
+    corpus = build_corpus(tempfile.mkdtemp(prefix="corpus_")) if generated else sys.argv[1]
+    paths = find_documents(corpus)
+
+    try:
+        start_time = time.perf_counter()
+        serial_documents, serial_counts, total_bytes = serial_corpus_count(paths)
+        report("Single-process", paths, total_bytes, time.perf_counter() - start_time)
+
+        start_time = time.perf_counter()
+        per_document, global_counts, total_bytes = parallel_corpus_count(paths)
+        report("Parallel", paths, total_bytes, time.perf_counter() - start_time)
+
+        # Both runs must agree, per document and overall
+        assert per_document == serial_documents and global_counts == serial_counts
+        print(f"\n{len(global_counts)} distinct words, {sum(global_counts.values())} words in total")
+        print("Most common:", sorted(global_counts.items(), key=lambda item: item[1], reverse=True)[:10])
+    finally:
+        if generated:
+            shutil.rmtree(corpus)
@@ -0,0 +1,202 @@
+# Importing required libraries
+import math
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import sysconfig
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+from corpus import MOBY_DICK
+from task3 import map_function, combine_results, split_into_chunks
+
+# Interpreters tried for the free-threaded comparison when the current one has a GIL
+FREE_THREADED_PYTHONS = ["python3.14t", "python3.13t"]
+
+
+# --- Work functions, run by every backend ---
+
+# Counting a batch of chunks and timing it. Wall time includes waiting for the GIL, CPU time does not,
+# so for threads the difference shows GIL contention
+def count_batch(chunks):
+    start_wall, start_cpu = time.perf_counter(), time.thread_time()
+    word_counts = combine_results(map_function(chunk) for chunk in chunks)
+    return word_counts, time.perf_counter() - start_wall, time.thread_time() - start_cpu
+
+# Shared memory blocks attached by this worker process, reused across tasks
+attached_blocks = {}
+
+# Counting a byte range of the text held in shared memory: only the block name and offsets travel to the worker
+def count_shared(name, start, end):
+    if name not in attached_blocks:
+        attached_blocks[name] = shared_memory.SharedMemory(name=name)
+    text = bytes(attached_blocks[name].buf[start:end]).decode("utf-8")
+    return count_batch([text])
+
+
+# --- Backends ---
+# Every backend has a name and a count(chunks) method returning the merged word counts, a list of
+# (wall seconds, cpu seconds) per task, and the objects pickled to and from workers (empty when nothing is pickled).
+# The messages are returned rather than measured, so their size can be computed outside the timed run.
+
+# Splitting chunks into about `batches` contiguous batches
+def make_batches(chunks, batches):
+    size = max(1, math.ceil(len(chunks) / batches))
+    return [chunks[i:i + size] for i in range(0, len(chunks), size)]
+
+
+class SerialBackend:
+    """Counts every chunk in the calling thread."""
+    name = "serial"
+
+    def __init__(self, workers=1):
+        self.workers = 1
+
+    def count(self, chunks):
+        word_counts, wall, cpu = count_batch(chunks)
+        return word_counts, [(wall, cpu)], []
+
+
+class ThreadBackend:
+    """ThreadPoolExecutor over batches of chunks. Shares memory, but the GIL serialises the Python work."""
+    name = "threads"
+
+    def __init__(self, workers=None, batches_per_worker=4):
+        self.workers = workers or os.cpu_count()
+        self.batches_per_worker = batches_per_worker
+
+    def count(self, chunks):
+        with ThreadPoolExecutor(self.workers) as executor:
+            results = list(executor.map(count_batch, make_batches(chunks, self.workers * self.batches_per_worker)))
+        return combine_results(counts for counts, _, _ in results), [(wall, cpu) for _, wall, cpu in results], []
+
+
+class ProcessBackend:
+    """
+    ProcessPoolExecutor with chunked submission: chunks are sent in a few large batches instead of one task per chunk,
+    so the pickling and IPC cost is paid per batch.
+    """
+    name = "processes"
+
+    def __init__(self, workers=None, batches_per_worker=4):
+        self.workers = workers or os.cpu_count()
+        self.batches_per_worker = batches_per_worker
+
+    def count(self, chunks):
+        batches = make_batches(chunks, self.workers * self.batches_per_worker)
+        with ProcessPoolExecutor(self.workers) as executor:
+            results = list(executor.map(count_batch, batches))
+        return combine_results(counts for counts, _, _ in results), [(wall, cpu) for _, wall, cpu in results], batches + results
+
+
+class SharedMemoryBackend:
+    """
+    Processes reading the text from one shared memory block. The text is copied into the block once,
+    and workers only receive (block name, start, end), so just the word counts are pickled.
+    """
+    name = "shared memory"
+
+    def __init__(self, workers=None, batches_per_worker=4):
+        self.workers = workers or os.cpu_count()
+        self.batches_per_worker = batches_per_worker
+
+    def count(self, chunks):
+        # Chunks are joined with newlines, so a byte range of whole chunks counts the same as the chunks one by one
+        ranges, pieces, position = [], [], 0
+        for batch in make_batches(chunks, self.workers * self.batches_per_worker):
+            data = "\n".join(batch).encode("utf-8") + b"\n"
+            ranges.append((position, position + len(data)))
+            pieces.append(data)
+            position += len(data)
+
+        block = shared_memory.SharedMemory(create=True, size=max(position, 1))
+        try:
+            block.buf[:position] = b"".join(pieces)
+            with ProcessPoolExecutor(self.workers) as executor:
+                arguments = [(block.name, start, end) for start, end in ranges]
+                futures = [executor.submit(count_shared, *task) for task in arguments]
+                results = [future.result() for future in futures]
+        finally:
+            block.close()
+            block.unlink()
+
+        return combine_results(counts for counts, _, _ in results), [(wall, cpu) for _, wall, cpu in results], arguments + results
+
+
+BACKENDS = [SerialBackend, ThreadBackend, ProcessBackend, SharedMemoryBackend]
+
+
+# --- Benchmark ---
+
+# Whether this interpreter is a free-threaded build, and whether the GIL is actually disabled right now
+def gil_status():
+    free_threaded = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+    gil_enabled = sys._is_gil_enabled() if hasattr(sys, "_is_gil_enabled") else True
+    return free_threaded, gil_enabled
+
+
+# Running every backend on the same chunks and printing where the time goes:
+# - speedup: serial wall time / backend wall time
+# - task wall - task CPU: time tasks spent waiting; for threads this is mostly waiting for the GIL
+# - overhead: wall time not explained by the CPU work spread over the workers (process start-up, pickling, IPC, merging)
+def benchmark(chunks, workers=None, repeats=3):
+    free_threaded, gil_enabled = gil_status()
+    print(f"Python {sys.version.split()[0]}, free-threaded build: {free_threaded}, GIL enabled: {gil_enabled}")
+    print(f"{len(chunks)} chunks, {sum(len(chunk) for chunk in chunks) / 1e6:.1f} MB, {workers or os.cpu_count()} workers\n")
+    print(f"{'backend':>14} {'wall s':>8} {'speedup':>8} {'task CPU s':>11} {'waiting s':>10} {'overhead s':>11} {'IPC MB':>8}")
+
+    reference, serial_duration = None, None
+    for backend_class in BACKENDS:
+        backend = backend_class(workers)
+        # Keeping the fastest of the repeats, with the task timings of that same run
+        runs = []
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            word_counts, tasks, messages = backend.count(chunks)
+            runs.append((time.perf_counter() - start_time, tasks))
+        duration, tasks = min(runs, key=lambda run: run[0])
+        ipc_bytes = sum(len(pickle.dumps(message)) for message in messages)
+
+        # All backends must produce the same counts
+        if reference is None:
+            reference, serial_duration = word_counts, duration
+        assert word_counts == reference, f"{backend.name} counts differ from the serial counts"
+
+        task_wall = sum(wall for wall, _ in tasks)
+        task_cpu = sum(cpu for _, cpu in tasks)
+        overhead = max(0.0, duration - task_cpu / backend.workers)
+        print(f"{backend.name:>14} {duration:8.3f} {serial_duration / duration:7.2f}x {task_cpu:11.3f} "
+              f"{task_wall - task_cpu:10.3f} {overhead:11.3f} {ipc_bytes / 1e6:8.2f}")
+
+
+# Finding a free-threaded interpreter on the PATH, to compare the thread backend without the GIL
+def find_free_threaded_python():
+    for name in FREE_THREADED_PYTHONS:
+        path = shutil.which(name)
+        if path is not None:
+            return path
+    return None
+
+
+# Benchmarking the backends on Moby Dick (repeated `scale` times to give the workers enough to do)
+# Usage: python executors.py [scale] [workers]
+if __name__ == "__main__":
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    with open(MOBY_DICK, "r", encoding="utf-8") as file:
+        text = file.read()
+    benchmark(split_into_chunks(text) * scale, workers)
+
+    # Repeat the benchmark on a free-threaded build, if this one has a GIL and one is installed
+    free_threaded, _ = gil_status()
+    free_threaded_python = find_free_threaded_python()
+    if not free_threaded and os.environ.get("EXECUTORS_CHILD") is None:
+        if free_threaded_python is None:
+            print("\nNo free-threaded Python found (tried " + ", ".join(FREE_THREADED_PYTHONS) + ").")
+        else:
+            print(f"\nFree-threaded run with {free_threaded_python}:")
+            subprocess.run([free_threaded_python, os.path.abspath(__file__), *sys.argv[1:]],
+                           env={**os.environ, "EXECUTORS_CHILD": "1", "PYTHON_GIL": "0"}, check=False)
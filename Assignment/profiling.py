@@ -0,0 +1,315 @@
+# Importing required libraries
+import contextlib
+import csv
+import gc
+import math
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+# Methods timed on every step when a model is instrumented, and the phase they are reported under
+SCHEDULE_PHASES = {"step": "activation", "shuffle_do": "activation", "do": "activation"}
+DATACOLLECTOR_PHASES = {"collect": "data collection"}
+
+# Methods only timed on detailed steps, because they are called once per agent or more
+GRID_METHODS = ["get_cell_list_contents", "get_neighborhood", "move_agent", "place_agent", "remove_agent"]
+AGENT_PHASES = {"move": "movement", "give_money": "transfer"}
+# Model methods called once per agent move: (phase, counter)
+MODEL_PHASES = {"is_blocked": ("collision", "collision_checks")}
+
+# Columns only measured on detailed steps; on other steps they are left empty rather than reported as 0
+DETAIL_COLUMNS = ([f"{phase}_ms" for phase in list(AGENT_PHASES.values()) + ["grid"]]
+                  + [f"{phase}_ms" for phase, _ in MODEL_PHASES.values()]
+                  + ["grid_calls"] + [counter for _, counter in MODEL_PHASES.values()])
+
+# Shared do-nothing context, returned by a disabled profiler so phases cost (almost) nothing
+NO_PHASE = contextlib.nullcontext()
+
+
+class StepProfiler:
+    """
+    Lightweight step-level profiler for the mesa models in this repository.
+    Phases are timed with perf_counter_ns and nested, so each phase knows its caller (e.g. step;activation;movement;grid).
+    The profiler can time phases explicitly (`with profiler.phase("rendering"):`, or a wrapped portrayal function
+    `profiler.wrap(agent_portrayal, "rendering")`), or attach itself to a model with
+    instrument(model), which wraps the model step, the schedule, data collection and print on every step.
+    Per-agent movement and grid calls are made thousands of times per step, so they are only wrapped on every
+    `detail_every`-th step; the flamegraph is built from those detailed steps, and in the step table their columns
+    are empty (None) on the other steps.
+    A disabled profiler does not touch the model at all, and its phases return a shared no-op context.
+    """
+    def __init__(self, enabled=True, detail_every=20, track_allocations=False):
+        if detail_every < 1:
+            raise ValueError(f"detail_every must be at least 1 (1 = every step is detailed), got {detail_every}.")
+        self.enabled = enabled
+        self.detail_every = detail_every
+        self.track_allocations = track_allocations and enabled
+        self.detailed = False # Whether the current step is a detailed one
+        self.stack = [] # Open phases as [name, start time, time spent in child phases]
+        self.self_time = defaultdict(int) # Exclusive nanoseconds per collapsed stack, from detailed steps
+        self.step_phases = defaultdict(int) # Inclusive nanoseconds per phase name in the current step
+        self.step_counters = defaultdict(int)
+        self.steps = [] # One record per finished model step
+        self.patches = [] # (object, attribute, original value) for detach()
+
+    # --- Timing ---
+    def enter(self, name):
+        self.stack.append([name, time.perf_counter_ns(), 0])
+
+    def exit(self):
+        name, start, child_time = self.stack.pop()
+        elapsed = time.perf_counter_ns() - start
+        self.step_phases[name] += elapsed
+        if self.detailed:
+            path = ";".join([frame[0] for frame in self.stack] + [name])
+            self.self_time[path] += elapsed - child_time
+        if self.stack:
+            self.stack[-1][2] += elapsed
+
+    @contextlib.contextmanager
+    def _phase(self, name):
+        self.enter(name)
+        try:
+            yield
+        finally:
+            self.exit()
+
+    def phase(self, name):
+        """Context manager timing a named phase; a no-op when the profiler is disabled."""
+        if not self.enabled:
+            return NO_PHASE
+        return self._phase(name)
+
+    def count(self, name, amount=1):
+        """Adds to a named counter of the current step."""
+        if self.enabled:
+            self.step_counters[name] += amount
+
+    def start_step(self, detailed=False):
+        self.detailed = detailed
+        if self.track_allocations:
+            self.step_memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self.enter("step")
+
+    def finish_step(self):
+        self.exit()
+        record = {"step": len(self.steps) + 1, "detailed": self.detailed}
+        record.update({f"{name}_ms": duration / 1e6 for name, duration in self.step_phases.items()})
+        record.update(self.step_counters)
+        if not self.detailed:
+            # Per-agent phases and grid calls are not measured on this step, so they are left out of its record
+            for column in DETAIL_COLUMNS:
+                record.pop(column, None)
+        if self.track_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            record["allocated_bytes"] = current - self.step_memory
+            record["peak_bytes"] = peak - self.step_memory
+        self.steps.append(record)
+        self.step_phases.clear()
+        self.step_counters.clear()
+        self.detailed = False
+
+    # --- Instrumentation ---
+    def wrap(self, func, phase=None, counter=None):
+        """Returns func timed as `phase` and/or counted under `counter`."""
+        if not self.enabled:
+            return func
+        stack, enter, exit, counters = self.stack, self.enter, self.exit, self.step_counters
+
+        def wrapper(*args, **kwargs):
+            if counter is not None:
+                counters[counter] += 1
+            # Calls nested in the same phase (e.g. move_agent calling place_agent) are timed once
+            if phase is None or (stack and stack[-1][0] == phase):
+                return func(*args, **kwargs)
+            enter(phase)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                exit()
+
+        return wrapper
+
+    def patch(self, obj, attribute, phase=None, counter=None, patches=None):
+        """Replaces obj.attribute with a timed/counted version, remembering the original for detach()."""
+        original = getattr(obj, attribute, None)
+        if original is None:
+            return
+        (self.patches if patches is None else patches).append((obj, attribute, vars(obj).get(attribute)))
+        setattr(obj, attribute, self.wrap(original, phase, counter))
+
+    def unpatch(self, patches):
+        for obj, attribute, original in reversed(patches):
+            if original is None:
+                with contextlib.suppress(AttributeError):
+                    delattr(obj, attribute)
+            else:
+                setattr(obj, attribute, original)
+        patches.clear()
+
+    def instrument(self, model, print_calls=True):
+        """
+        Attaches the profiler to a model (no-op when disabled).
+        Wraps model.step, the schedule (mesa 2) or agent set (mesa 3), the data collector and print in the modules
+        defining the model and its agents. On detailed steps, move/give_money of the agents (or of the model itself)
+        and grid methods (lookups and moves, counted as grid_calls) are wrapped too.
+        """
+        if not self.enabled:
+            return model
+        if self.track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        # Mesa 2 models activate agents through a schedule, mesa 3 models through their AgentSet
+        schedule = getattr(model, "schedule", None)
+        activation = schedule if schedule is not None else getattr(model, "agents", None)
+        if activation is not None and not isinstance(activation, list):
+            for attribute, phase in SCHEDULE_PHASES.items():
+                self.patch(activation, attribute, phase)
+
+        if getattr(model, "datacollector", None) is not None:
+            for attribute, phase in DATACOLLECTOR_PHASES.items():
+                self.patch(model.datacollector, attribute, phase)
+
+        def current_agents():
+            return list(schedule.agents if schedule is not None else getattr(model, "agents", []))
+
+        if print_calls:
+            modules = {type(model).__module__} | {type(agent).__module__ for agent in current_agents()}
+            for module_name in modules:
+                module = sys.modules.get(module_name)
+                if module is not None:
+                    self.patches.append((module, "print", vars(module).get("print")))
+                    module.print = self.wrap(print, "print", counter="prints")
+
+        detail_patches = []
+        original_step = model.step
+
+        def step(*args, **kwargs):
+            # Detail wrappers are installed and removed outside the timed step
+            detailed = len(self.steps) % self.detail_every == 0
+            if detailed:
+                if getattr(model, "grid", None) is not None:
+                    for attribute in GRID_METHODS:
+                        self.patch(model.grid, attribute, "grid", counter="grid_calls", patches=detail_patches)
+                # Array-backed models (BoltzmannWealthArray) move and transfer on the model itself
+                for agent in current_agents() + [model]:
+                    for attribute, phase in AGENT_PHASES.items():
+                        if hasattr(agent, attribute):
+                            self.patch(agent, attribute, phase, patches=detail_patches)
+                # Collision checks (ParkingLot.is_blocked) get their own phase, nested under movement
+                for attribute, (phase, counter) in MODEL_PHASES.items():
+                    self.patch(model, attribute, phase, counter=counter, patches=detail_patches)
+            self.start_step(detailed)
+            try:
+                return original_step(*args, **kwargs)
+            finally:
+                self.finish_step()
+                self.unpatch(detail_patches)
+
+        self.patches.append((model, "step", vars(model).get("step")))
+        model.step = step
+        return model
+
+    def detach(self):
+        """Restores everything instrument() replaced."""
+        self.unpatch(self.patches)
+
+    # --- Export ---
+    def collapsed_stacks(self):
+        """Returns the profile in the collapsed-stack format read by flamegraph.pl and speedscope (microseconds)."""
+        return [f"{path} {duration // 1000}" for path, duration in sorted(self.self_time.items())]
+
+    def write_flamegraph(self, file_path):
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write("\n".join(self.collapsed_stacks()) + "\n")
+
+    def step_table(self):
+        """
+        Returns one row per step with per-phase timings (ms) and counters.
+        Values missing from a step are 0, except detail-only columns on non-detailed steps, which are None (not measured).
+        """
+        columns = []
+        for record in self.steps:
+            columns.extend(key for key in record if key not in columns)
+        return columns, [[record.get(column, 0 if record["detailed"] or column not in DETAIL_COLUMNS else None)
+                          for column in columns] for record in self.steps]
+
+    def write_step_table(self, file_path):
+        columns, rows = self.step_table()
+        with open(file_path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(columns)
+            writer.writerows(rows) # None is written as an empty cell
+
+    def print_step_table(self, file=None):
+        columns, rows = self.step_table()
+        print(" ".join(f"{column:>16}" for column in columns), file=file or sys.stdout)
+        for row in rows:
+            print(" ".join(f"{value:>16.3f}" if isinstance(value, float) else f"{'-' if value is None else value!s:>16}"
+                           for value in row),
+                  file=file or sys.stdout)
+
+
+def measure_overhead(make_model, num_steps=200, repeats=10, **profiler_options):
+    """
+    Times the same seeded run without profiler, with a disabled profiler and with an enabled one.
+    The three configurations are run in turn, repeats times, and the fastest run of each is kept,
+    so that machine noise (which only ever slows a run down) affects all of them alike.
+    The garbage collector is paused during the timed steps.
+    """
+    configurations = {
+        "no profiler": lambda: None,
+        "disabled": lambda: StepProfiler(enabled=False, **profiler_options),
+        "enabled": lambda: StepProfiler(**profiler_options),
+    }
+    durations = {label: math.inf for label in configurations}
+    for _ in range(repeats):
+        for label, make_profiler in configurations.items():
+            with contextlib.redirect_stdout(None):
+                model = make_model()
+                profiler = make_profiler()
+                if profiler is not None:
+                    profiler.instrument(model)
+                # Like timeit, the garbage collector is kept out of the timed loop
+                gc.collect()
+                gc.disable()
+                try:
+                    start_time = time.perf_counter()
+                    for _ in range(num_steps):
+                        model.step()
+                    durations[label] = min(durations[label], time.perf_counter() - start_time)
+                finally:
+                    gc.enable()
+    return durations
+
+
+# Profiling the parking lot model and printing a per-step table and flamegraph stacks
+if __name__ == "__main__":
+    import copy
+    from task1 import ParkingLot
+
+    # Every run starts from a copy of the same lot, so the runs are comparable
+    with contextlib.redirect_stdout(None):
+        base_model = ParkingLot(50, 50, 200, 100, 100)
+
+    def make_parking_lot():
+        model = copy.deepcopy(base_model)
+        model.random.seed(1)
+        return model
+
+    profiler = StepProfiler(detail_every=5)
+    with contextlib.redirect_stdout(None):
+        model = profiler.instrument(make_parking_lot())
+        for _ in range(10):
+            model.step()
+    profiler.print_step_table()
+    print()
+    print("\n".join(profiler.collapsed_stacks()))
+
+    for detail_every in (1, 20, 100):
+        print(f"\nOverhead (200 steps, best of 10, detail every {detail_every} steps):")
+        durations = measure_overhead(make_parking_lot, detail_every=detail_every)
+        for label, duration in durations.items():
+            print(f"{label:>12}: {duration:.4f} s ({duration / durations['no profiler'] - 1:+.1%})")
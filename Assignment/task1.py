@@ -1,5 +1,11 @@
 # importing Libraries 
+import contextlib
+import io
+import sys
+import time
+import tracemalloc
 import nest_asyncio
+import numpy as np
 from mesa import Agent, Model
 from mesa.time import RandomActivation
 from mesa.space import MultiGrid
@@ -14,8 +20,12 @@ nest_asyncio.apply()
 # List for holding parking spaces
 parking_spaces = []
 
+# The agent classes use __slots__ for their own attributes. Mesa's Agent base class has no __slots__,
+# so the base attributes (unique_id, model, pos) still live in a small per-instance __dict__.
 class ParkingSpace(Agent):
     """Creating the ParkingSpace Agent each with a unique ID."""
+    __slots__ = ("location", "occupied")
+
     def __init__(self, unique_id, model, location):
         super().__init__(unique_id, model)
         self.location = location # The parking space's position on the grid
@@ -23,12 +33,16 @@ class ParkingSpace(Agent):
 
 class Tree(Agent):
     """Tree agent that acts as an obstacle in the parking lot."""
+    __slots__ = ("location",)
+
     def __init__(self, unique_id, model, location):
         super().__init__(unique_id, model)
         self.location = location
 
 class Car(Agent):
     """Creating the Car Agent, each with a unique ID"""
+    __slots__ = ("location", "steps_taken", "parking_step", "parked", "steps_to_park", "current_steps")
+
     def __init__(self, unique_id, model, location):
         super().__init__(unique_id, model)
         self.location = location # The current position of the car on the grid
@@ -46,45 +60,42 @@ class Car(Agent):
             (1, 0),  # Move right
             (-1, 0)  # Move left
         ]
+        model = self.model
 
         if not self.parked:
             # Shuffle steps to ensure randomness
             self.random.shuffle(possible_steps)
 
             for dx, dy in possible_steps:
-                new_x = (self.location[0] + dx) % self.model.grid.width
-                new_y = (self.location[1] + dy) % self.model.grid.height
+                new_x = (self.location[0] + dx) % model.grid.width
+                new_y = (self.location[1] + dy) % model.grid.height
                 new_pos = (new_x, new_y)
 
-                # Check if the cell is empty
-                cell_contents = self.model.grid.get_cell_list_contents([new_pos])
-                if not any(isinstance(agent, (Car, Tree)) for agent in cell_contents):
+                # Check if the cell is free of cars and trees
+                if not model.is_blocked(new_pos):
                     # Move to the new position
-                    self.model.grid.move_agent(self, new_pos)
+                    model.grid.move_agent(self, new_pos)
+                    model.car_map[self.location] = False
+                    model.car_map[new_pos] = True
                     self.location = new_pos
                     self.steps_taken += 1
                     self.current_steps += 1 
                     break  
 
             # Check if the car has found an unoccupied parking space
-            for agent in self.model.grid.get_cell_list_contents([self.location]):
-                if isinstance(agent, ParkingSpace) and not agent.occupied:
-                    agent.occupied = True
-                    self.parked = True 
-                    self.parking_step = 0 # Reset the parking step counter
-                    self.steps_to_park.append(self.current_steps) # Save the number of steps it took to park
-                    print(f"Agent {agent.unique_id} found a parking spot after {self.current_steps} steps.")
-                    break 
+            if model.free_space_map[self.location]:
+                space = model.occupy_space(self.location)
+                self.parked = True 
+                self.parking_step = 0 # Reset the parking step counter
+                self.steps_to_park.append(self.current_steps) # Save the number of steps it took to park
+                print(f"Agent {space.unique_id} found a parking spot after {self.current_steps} steps.")
                      
         if self.parked:
         # Increment parking step counter
             self.parking_step += 1
-            if self.parking_step > self.model.random.randint(3, 6): # Check if the car has been parked for 3-5 steps
+            if self.parking_step > model.random.randint(3, 6): # Check if the car has been parked for 3-5 steps
                 # Leave the parking space
-                for agent in self.model.grid.get_cell_list_contents([self.location]): # Check if the car is parked
-                    if isinstance(agent, ParkingSpace) and agent.occupied: # Check if the parking space is occupied
-                        agent.occupied = False # Mark space as unoccupied
-                        break
+                model.release_space(self.location)
                     
                 self.parked = False # Mark the car as not parked
                 self.parking_step = 0 # Reset parking step counter
@@ -95,6 +106,10 @@ class Car(Agent):
         # if self.steps_taken < self.model.n_steps:
         self.move()
 
+# Reporter for the data collector, a named function (not a lambda) so the model can be pickled by checkpoint.py
+def steps_to_park(agent):
+    return agent.steps_to_park if isinstance(agent, Car) else None
+
 # ParkingLot Model Class
 class ParkingLot(Model):
     """Model class for the Parking Lot Model, which contains the grid and schedule."""
@@ -103,43 +118,68 @@ class ParkingLot(Model):
         self.grid = MultiGrid(width, height, True)
         self.schedule = RandomActivation(self)
         self.datacollector = DataCollector(
-            agent_reporters={
-                "StepsTaken":lambda agent: 
-                agent.steps_to_park if isinstance(agent, Car) 
-                else None
-            }
+            agent_reporters={"StepsTaken": steps_to_park}
         )
         self.n_cars = n_cars
         self.n_parking_spaces = n_parking_spaces
         self.running = True 
 
+        # Occupancy bitmaps, so "is this cell blocked / a free space" is a single array read
+        self.car_map = np.zeros((width, height), dtype=bool)
+        self.tree_map = np.zeros((width, height), dtype=bool)
+        self.space_map = np.zeros((width, height), dtype=bool)
+        self.free_space_map = np.zeros((width, height), dtype=bool)
+        self.spaces_by_location = {} # The ParkingSpace agent in each parking cell
+
         # Add parking spaces
         for i in range(n_parking_spaces):
             x, y = self.random.randrange(width), self.random.randrange(height)
-            while any(isinstance(agent, ParkingSpace) for agent in self.grid.get_cell_list_contents([(x, y)])):
+            while self.space_map[x, y]:
                 x, y = self.random.randrange(width), self.random.randrange(height)
             parking_space = ParkingSpace(i, self, location=(x, y))
             self.schedule.add(parking_space)
             self.grid.place_agent(parking_space, (x, y))
+            self.space_map[x, y] = self.free_space_map[x, y] = True
+            self.spaces_by_location[(x, y)] = parking_space
             parking_spaces.append(parking_space) # Save parking spaces in a list so cars know if they are parked or not   
 
         for i in range(n_trees):
             x, y = self.random.randrange(width), self.random.randrange(height)
-            while any(isinstance(agent, (Tree, ParkingSpace)) for agent in self.grid.get_cell_list_contents([(x, y)])):
+            while self.tree_map[x, y] or self.space_map[x, y]:
                 x, y = self.random.randrange(width), self.random.randrange(height)
             tree = Tree(i + n_cars + n_parking_spaces, self, location=(x, y))
             self.schedule.add(tree)
             self.grid.place_agent(tree, (x, y))
+            self.tree_map[x, y] = True
 
         # Add cars
         for i in range(n_cars):
             x, y = self.random.randrange(width), self.random.randrange(height)
-            car = Car(i + n_parking_spaces , self, location=(x, y))
-            while any(isinstance(agent, (Car, ParkingSpace, Tree)) for agent in self.grid.get_cell_list_contents([(x, y)])):
+            while self.car_map[x, y] or self.space_map[x, y] or self.tree_map[x, y]:
                 # Ensure neither cars, trees or parkingSpace are in the same spot
                 x, y = self.random.randrange(width), self.random.randrange(height)
+            car = Car(i + n_parking_spaces , self, location=(x, y)) # Created once the spot is found, so location matches the grid
             self.schedule.add(car) # Add the car to the schedule
             self.grid.place_agent(car, (x, y)) # Place the car on the grid 
+            self.car_map[x, y] = True
+
+    def is_blocked(self, pos):
+        """A cell is blocked if a car or a tree is on it."""
+        return self.car_map[pos] or self.tree_map[pos]
+
+    def occupy_space(self, pos):
+        """Marks the parking space at pos as occupied and returns it."""
+        space = self.spaces_by_location[pos]
+        space.occupied = True
+        self.free_space_map[pos] = False
+        return space
+
+    def release_space(self, pos):
+        """Marks the parking space at pos (if any) as free again."""
+        space = self.spaces_by_location.get(pos)
+        if space is not None and space.occupied:
+            space.occupied = False
+            self.free_space_map[pos] = True
 
     def step(self):
         self.schedule.step() # Activate each agent
@@ -183,8 +223,40 @@ def agent_portrayal(agent):
 # Create the grid for visualization 10x10 grid for example
 canvas_element = CanvasGrid(agent_portrayal, 10, 10, 500, 500)
 
-server = ModularServer(ParkingLot, [canvas_element], "Parking Lot Model",
-                           {"width": 10, "height": 10, "n_cars": 5, "n_parking_spaces": 10, "n_trees": 5})
-server.port = 8521
+def agent_memory(agent_class, model, num_agents=10000):
+    """Average bytes traced by tracemalloc per instance of an agent class (location tuple shared, not counted)."""
+    agents = [None] * num_agents # Allocated before tracing, so the list itself is not counted
+    location = (0, 0)
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    for i in range(num_agents):
+        agents[i] = agent_class(i, model, location)
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return used / num_agents
+
+def benchmark_parking_lot(width=500, height=500, n_cars=20000, n_parking_spaces=10000, n_trees=10000, num_steps=10):
+    """Reports memory per agent and the mean step time of a large parking lot."""
+    model = ParkingLot(width, height, n_cars, n_parking_spaces, n_trees)
+    for agent_class in (Car, ParkingSpace, Tree):
+        print(f"{agent_class.__name__}: {agent_memory(agent_class, model):.0f} bytes per agent")
+
+    # Cars print when they park, keep the output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        start_time = time.perf_counter()
+        for _ in range(num_steps):
+            model.step()
+        duration = time.perf_counter() - start_time
+    print(f"{width}x{height} lot, {n_cars} cars, {n_parking_spaces} spaces, {n_trees} trees: "
+          f"{duration / num_steps * 1000:.0f} ms per step (mean of {num_steps} steps)")
+
+# Only launch the server when run as a script, so the model can be imported (e.g. by checkpoint.py)
+# `python task1.py benchmark` measures the large lot instead
+if __name__ == "__main__" and sys.argv[1:] == ["benchmark"]:
+    benchmark_parking_lot()
+elif __name__ == "__main__":
+    server = ModularServer(ParkingLot, [canvas_element], "Parking Lot Model",
+                               {"width": 10, "height": 10, "n_cars": 5, "n_parking_spaces": 10, "n_trees": 5})
+    server.port = 8521
 
-server.launch()
+    server.launch()
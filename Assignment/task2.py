@@ -1,5 +1,4 @@
 # Importing required libraries
-import random
 import nest_asyncio
 from multiprocessing import Pool, cpu_count
 from mesa import Agent, Model
@@ -8,14 +7,16 @@ from mesa.space import MultiGrid
 from mesa.datacollection import DataCollector
 from mesa.visualization.modules import CanvasGrid
 from mesa.visualization.ModularVisualization import ModularServer 
+from workload import UniformWorkload
 
 # nest_asyncio to prevent event loop issues, when running the code in environments like Jupyter Notebook
 nest_asyncio.apply()
 
 class Task: 
     """Represents a task with a duration and resource requirement."""
-    def __init__(self, task_id, duration, resources):
+    def __init__(self, task_id, duration, resources, arrival=0):
         self.task_id = task_id
+        self.arrival = arrival # The step at which the task becomes available
         self.duration = duration
         self.resources = resources 
         self.remaining_duration = duration 
@@ -81,11 +82,18 @@ class WorkerAgent(Agent):
 
 
 class CooperativeTaskModel(Model):
-    """A model for cooperative task scheduling."""
-    def __init__(self, width, height, num_agents, task_list):
+    """
+    A model for cooperative task scheduling.
+    Tasks come either from a ready-made task_list, or from a workload: a callable returning an iterator of TaskSpec
+    (see workload.py). Workload tasks are pulled lazily as their arrival step is reached, and completed tasks are
+    dropped from pending_tasks, so memory stays bounded by the number of tasks in flight.
+    """
+    def __init__(self, width, height, num_agents, task_list=None, workload=None):
         self.grid = MultiGrid(width, height, True)
         self.schedule = RandomActivation(self)
-        self.pending_tasks = task_list
+        self.pending_tasks = list(task_list) if task_list is not None else []
+        self.workload = iter(workload()) if workload is not None else iter(())
+        self.next_spec = next(self.workload, None) # The next task that has not arrived yet
         
         self.agents = []
         capacities = [1, 2, 2] 
@@ -101,19 +109,28 @@ class CooperativeTaskModel(Model):
 
         self.running = True
 
+    def release_arrived_tasks(self):
+        """Moves every workload task whose arrival step has been reached into pending_tasks."""
+        while self.next_spec is not None and self.next_spec.arrival <= self.schedule.steps:
+            spec = self.next_spec
+            self.pending_tasks.append(Task(spec.task_id, spec.duration, spec.resources, arrival=spec.arrival))
+            self.next_spec = next(self.workload, None)
+
     # Step function for the model, which prints the current step and calls the step function of the schedule
     def step(self):
         print(f'{"-"*10} Step {self.schedule.steps + 1} {"-"*10}')
+        self.release_arrived_tasks()
         self.schedule.step()
+        # Forget completed tasks, agents still holding one clean it up on their next step
+        self.pending_tasks = [task for task in self.pending_tasks if not task.is_complete()]
 
 def generate_tasks():
-    """Generates a list of tasks with varying duration and resource requirements."""
-    tasks = []
-    for i in range(50):
-        duration = random.randint(5, 20)
-        resources = random.randint(1, 3)
-        tasks.append(Task(i, duration, resources))
-    return tasks
+    """
+    Generates a list of tasks with varying duration and resource requirements, all available at step 0.
+    Kept for building a model from a fixed task_list, e.g. CooperativeTaskModel(10, 10, 3, task_list=generate_tasks());
+    the server streams the same workload through workload=UniformWorkload instead.
+    """
+    return [Task(spec.task_id, spec.duration, spec.resources) for spec in UniformWorkload()]
 
 def agent_portrayal(agent):
     """Function to define the portrayal of agents in the visualization."""
@@ -136,8 +153,10 @@ def agent_portrayal(agent):
 
 canvas_element = CanvasGrid(agent_portrayal, 10, 10, 500, 500)
 
-server = ModularServer(CooperativeTaskModel, [canvas_element], "Cooperative Task Model",
-                       {"width": 10, "height": 10, "num_agents": 3, "task_list": generate_tasks()})
+# Only launch the server when run as a script, so the model can be imported (e.g. by checkpoint.py)
+if __name__ == "__main__":
+    server = ModularServer(CooperativeTaskModel, [canvas_element], "Cooperative Task Model",
+                           {"width": 10, "height": 10, "num_agents": 3, "workload": UniformWorkload})
 
-server.port = 8521
-server.launch()
\ No newline at end of file
+    server.port = 8521
+    server.launch()
\ No newline at end of file
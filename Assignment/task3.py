@@ -1,17 +1,21 @@
 # Importing required libraries
 import time
-import requests
 import re
 from multiprocessing import Pool, cpu_count
 
-# Downloading the text file from GitHub
+# The text file on GitHub
 file_path = 'https://raw.githubusercontent.com/MonaTlili/Assignment-MAS/refs/heads/main/Moby_dick/pg2701.txt'
-response = requests.get(file_path, timeout=10) # Timeout is counted in seconds
-sample_text = response.text
+
+# Downloading the text file, only done when run as a script so that worker processes (and corpus.py) can import this module
+def download_text(url):
+    import requests # Only needed for the download, so the counting functions work without it
+    response = requests.get(url, timeout=10) # Timeout is counted in seconds
+    return response.text
 
 # Splitting the text into sentences for smaller chunks of data
-text_cleaned = sample_text.replace('!', '.').replace('?', '.')
-text_chunks = text_cleaned.split('.')
+def split_into_chunks(text):
+    text_cleaned = text.replace('!', '.').replace('?', '.')
+    return text_cleaned.split('.')
 
 # Map function to process a chunk of text, clean the text (by removing punctuations/underscores and converting to lowercase) and count word occurrences
 def map_function(chunk):
@@ -65,8 +69,8 @@ def single_threaded_word_count(text):
 if __name__ == "__main__":
     
     # Test data
-    text = sample_text
-    chunks = text_chunks
+    text = download_text(file_path)
+    chunks = split_into_chunks(text)
 
     print("Starting performance comparison...\n") 
     
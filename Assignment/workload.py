@@ -0,0 +1,165 @@
+# Importing required libraries
+import csv
+import json
+import random
+from collections import namedtuple
+
+# A task as it arrives from a workload source, before it is turned into a scheduler Task
+TaskSpec = namedtuple("TaskSpec", ["task_id", "arrival", "duration", "resources"])
+
+# Workloads are iterators of TaskSpec. They are classes rather than generators so that a model holding one
+# can be pickled by checkpoint.py and resume the stream where it left off.
+# Calling a workload class with its arguments gives the factory CooperativeTaskModel expects.
+
+
+# Trace files are JSON lines (.jsonl, one JSON object per line) or CSV (any other extension).
+# A plain .json file usually holds a single JSON document, which cannot be streamed, so it is rejected.
+def is_json_lines(file_path):
+    if file_path.endswith(".json"):
+        raise ValueError(f"{file_path}: traces must be JSON lines with a .jsonl extension, or CSV.")
+    return file_path.endswith(".jsonl")
+
+
+class TraceWorkload:
+    """
+    Streams tasks from a trace file, one line at a time, so traces larger than memory can be replayed.
+    Supports CSV (with a header row) and JSON lines (.jsonl), both with the fields task_id, arrival, duration and resources.
+    The trace is expected to be sorted by arrival step.
+    The file stays open while the trace is read; it is closed at the end of the trace, by close(),
+    when used as a context manager (`with TraceWorkload(path) as workload:`) or when the workload is garbage collected.
+    """
+    def __init__(self, file_path):
+        self.file = None # Set first, so __del__ works even if the path is rejected
+        self.rows = None # Parsed rows of the open file: CSV value lists or JSON strings
+        self.file_path = file_path
+        self.is_json = is_json_lines(file_path)
+        self.offset = 0 # Position in the file of the next unread line, in bytes
+        self.columns = None # Index of each TaskSpec field in the CSV header
+
+    def __iter__(self):
+        return self
+
+    # The file is read in binary mode and the offset advanced by the length of each line:
+    # tell() on a text file is slow enough to dominate the replay of large traces
+    def lines(self):
+        for line in self.file:
+            self.offset += len(line)
+            yield line.decode("utf-8")
+
+    def open(self):
+        """(Re)opens the trace at the offset of the next unread line, closing any handle still open."""
+        self.close()
+        self.file = open(self.file_path, "rb")
+        self.file.seek(self.offset)
+        self.rows = self.lines() if self.is_json else csv.reader(self.lines())
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            self.rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    def __next__(self):
+        if self.rows is None:
+            self.open()
+
+        for row in self.rows:
+            if self.is_json:
+                if not row.strip():
+                    continue
+                record = json.loads(row)
+                return TaskSpec(int(record["task_id"]), int(record["arrival"]), int(record["duration"]),
+                                int(record["resources"]))
+            if not row:
+                continue
+            if self.columns is None:
+                self.columns = [row.index(field) for field in TaskSpec._fields]
+                continue
+            return TaskSpec._make(int(row[column]) for column in self.columns)
+
+        self.close()
+        raise StopIteration
+
+    # Open files cannot be pickled, the file is reopened at the saved offset instead
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["file"] = state["rows"] = None
+        return state
+
+
+class SyntheticWorkload:
+    """
+    Generates tasks lazily from seeded distributions.
+    Arrivals follow a Poisson process with arrival_rate tasks per step (exponential inter-arrival times),
+    durations are heavy-tailed (Pareto with duration_shape, capped at max_duration).
+    With num_tasks=None the stream never ends.
+    """
+    def __init__(self, num_tasks=None, seed=None, arrival_rate=1.0, min_duration=5, max_duration=20,
+                 duration_shape=1.5, max_resources=3):
+        self.num_tasks = num_tasks
+        self.rng = random.Random(seed)
+        self.arrival_rate = arrival_rate
+        self.min_duration = min_duration
+        self.max_duration = max_duration
+        self.duration_shape = duration_shape
+        self.max_resources = max_resources
+        self.clock = 0.0
+        self.task_id = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.num_tasks is not None and self.task_id >= self.num_tasks:
+            raise StopIteration
+
+        self.clock += self.rng.expovariate(self.arrival_rate)
+        duration = min(int(self.min_duration * self.rng.paretovariate(self.duration_shape)), self.max_duration)
+        resources = self.rng.randint(1, self.max_resources)
+        spec = TaskSpec(self.task_id, int(self.clock), duration, resources)
+        self.task_id += 1
+        return spec
+
+
+class UniformWorkload:
+    """
+    Generates the original assignment workload: every task is available at step 0,
+    with a uniform duration between 5 and 20 and between 1 and 3 required resources.
+    """
+    def __init__(self, num_tasks=50, seed=None):
+        self.num_tasks = num_tasks
+        self.rng = random.Random(seed)
+        self.task_id = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.task_id >= self.num_tasks:
+            raise StopIteration
+
+        spec = TaskSpec(self.task_id, 0, self.rng.randint(5, 20), self.rng.randint(1, 3))
+        self.task_id += 1
+        return spec
+
+
+def write_trace(file_path, workload):
+    """Writes a workload to a trace file (JSON lines for .jsonl, CSV otherwise)."""
+    json_lines = is_json_lines(file_path)
+    with open(file_path, "w", encoding="utf-8", newline="") as file:
+        if json_lines:
+            for spec in workload:
+                file.write(json.dumps(spec._asdict()) + "\n")
+        else:
+            writer = csv.writer(file)
+            writer.writerow(TaskSpec._fields)
+            writer.writerows(workload)
@@ -1,5 +1,8 @@
 import random # Used to randomly choose the direction in which the truck will move during each step.
+import time
 import nest_asyncio
+import numpy as np
+import pandas as pd
 
 from mesa import Agent, Model
 from mesa.time import RandomActivation
@@ -80,6 +83,70 @@ class SimpleTruckModel(Model):
         for i in range(self.num_steps):
             self.step()
 
+    def run_batched(self):
+        """
+        Run all num_steps for all trucks at once with simulate_trajectories, instead of one agent at a time.
+        The trucks end up at their final positions and the schedule's step counter is advanced to num_steps,
+        as after run_model, so further step() calls are no-ops like they would be there.
+        The data that run_model would collect is returned in the same DataFrame format as
+        datacollector.get_agent_vars_dataframe(), instead of being added to the (still empty) datacollector.
+        """
+        if any(truck.steps_taken for truck in self.trucks):
+            raise ValueError("run_batched() simulates the whole run and must start from a fresh model.")
+
+        start = np.array([truck.location for truck in self.trucks])
+        seed = self.random.getrandbits(64) # Derived from the model's RNG, so seeded models stay reproducible
+        positions, steps_taken = simulate_trajectories(
+            self.grid.width, self.grid.height, self.num_agents, self.num_steps, start=start, seed=seed
+        )
+
+        # Move the truck agents to where the batched trajectories ended
+        if self.num_steps > 0:
+            for truck, (x, y), steps in zip(self.trucks, positions[-1].tolist(), steps_taken.tolist()):
+                truck.location = (x, y)
+                self.grid.move_agent(truck, truck.location)
+                truck.steps_taken = steps
+        self.schedule.steps += self.num_steps
+        self.schedule.time += self.num_steps
+
+        return positions, trajectory_dataframe([truck.unique_id for truck in self.trucks], self.num_steps)
+
+# --- Batched trajectories ---
+# The four moves of Truck.move as an array: up, down, right, left
+MOVES = np.array([(0, 1), (0, -1), (1, 0), (-1, 0)], dtype=np.int8)
+
+def simulate_trajectories(width, height, num_trucks, num_steps, start=None, seed=None):
+    """
+    Generate the random walks of a whole fleet at once as NumPy arrays, with torus wrap-around.
+    Returns a (num_steps x num_trucks x 2) position tensor, where positions[t] is where every truck is after
+    step t + 1, and the number of steps each truck took. Positions use the smallest integer type that fits the grid,
+    so fleets of 10^5-10^6 trucks stay within memory.
+    """
+    rng = np.random.default_rng(seed)
+    dtype = np.int16 if max(width, height) <= np.iinfo(np.int16).max else np.int32
+    if start is None:
+        start = np.column_stack((rng.integers(0, width, num_trucks), rng.integers(0, height, num_trucks)))
+    size = np.array([width, height], dtype=dtype)
+
+    positions = np.empty((num_steps, num_trucks, 2), dtype=dtype)
+    current = np.array(start, dtype=dtype)
+    for t in range(num_steps):
+        current += MOVES[rng.integers(0, len(MOVES), num_trucks, dtype=np.uint8)]
+        current %= size # Wrap around, like Truck.move
+        positions[t] = current
+
+    steps_taken = np.full(num_trucks, num_steps, dtype=np.int64) # Every truck moves on every step
+    return positions, steps_taken
+
+def trajectory_dataframe(agent_ids, num_steps):
+    """
+    Build the DataFrame run_model collects (index Step, AgentID; column StepsTaken) for a batched run.
+    Data is collected before each step, so at Step t every truck has taken t steps.
+    """
+    steps = np.repeat(np.arange(num_steps), len(agent_ids))
+    index = pd.MultiIndex.from_arrays([steps, np.tile(agent_ids, num_steps)], names=["Step", "AgentID"])
+    return pd.DataFrame({"StepsTaken": steps.astype(np.int64)}, index=index)
+
 # --- Visualization ---
 def agent_portrayal(agent):
     """Visual portrayal of agents."""
@@ -104,15 +171,31 @@ def truck_model():
     server.port = 8521
     return server
 
-server = truck_model()
+# Timing a large fleet, without creating agents at all
+def benchmark_trajectories(num_trucks=100_000, num_steps=100):
+    start_time = time.perf_counter()
+    positions, steps_taken = simulate_trajectories(width=1000, height=1000, num_trucks=num_trucks, num_steps=num_steps, seed=42)
+    print(f"{num_trucks} trucks x {num_steps} steps in {time.perf_counter() - start_time:.3f} seconds, "
+          f"positions {positions.shape} ({positions.nbytes / 1e6:.0f} MB)")
+
+# Only launch the server and run the examples when run as a script, so the model can be imported
+if __name__ == "__main__":
+    server = truck_model()
+
+    # Launch the server and allow the event loop to start
+    server.launch()
+
+    # After running the simulation
+    model = SimpleTruckModel(width=10, height=10, num_trucks=3, num_steps=100)
+    model.run_model()  # Run the model for exactly 100 steps
 
-# Launch the server and allow the event loop to start
-server.launch()
+    # Get the data
+    data = model.datacollector.get_agent_vars_dataframe()
+    print(data)
 
-# After running the simulation
-model = SimpleTruckModel(width=10, height=10, num_trucks=3, num_steps=100)
-model.run_model()  # Run the model for exactly 100 steps
+    # Batched run of the same model: all steps for all trucks at once, in the same DataFrame format
+    model = SimpleTruckModel(width=10, height=10, num_trucks=3, num_steps=100)
+    positions, data = model.run_batched()
+    print(data)
 
-# Get the data
-data = model.datacollector.get_agent_vars_dataframe()
-print(data)
+    benchmark_trajectories()
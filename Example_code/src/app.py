@@ -1,15 +1,7 @@
 # APP
 from mesa.examples.basic.boltzmann_wealth_model.model import BoltzmannWealth
-from mesa.visualization import (
-    SolaraViz,
-    make_plot_component,
-    make_space_component,
-)
-
-
-def agent_portrayal(agent):
-    color = agent.wealth  # we are using a colormap to translate wealth to color
-    return {"color": color}
+from mesa.visualization import SolaraViz
+from rendering import make_incremental_plot_component, make_incremental_space_component
 
 
 model_params = {
@@ -30,9 +22,6 @@ model_params = {
     "height": 10,
 }
 
-def post_process(ax):
-    ax.get_figure().colorbar(ax.collections[0], label="wealth", ax=ax)
-
 # Create initial model instance
 model = BoltzmannWealth(50, 10, 10)
 
@@ -42,10 +31,14 @@ model = BoltzmannWealth(50, 10, 10)
 # You can also author your own visualization elements, which can also be functions
 # that receive the model instance and return a valid solara component.
 
-SpaceGraph = make_space_component(
-    agent_portrayal, cmap="viridis", vmin=0, vmax=10, post_process=post_process
+# The incremental components only send changed cells and new Gini points to the browser,
+# and redraw at most `fps` times per second, however fast the model steps.
+# Each cell shows the mean wealth of the agents in it (empty cells stay blank), so vmax=10
+# keeps the per-agent scale of the original space. Grids above `max_cells` cells are shown as block averages.
+SpaceGraph = make_incremental_space_component(
+    "wealth", cmap="viridis", vmin=0, vmax=10, max_cells=128 * 128, fps=10
 )
-GiniPlot = make_plot_component("Gini")
+GiniPlot = make_incremental_plot_component("Gini", fps=10)
 
 # Create the SolaraViz page. This will automatically create a server and display the
 # visualization elements in a web browser.
@@ -57,6 +50,7 @@ page = SolaraViz(
     components=[SpaceGraph, GiniPlot],
     model_params=model_params,
     name="Boltzmann Wealth Model",
+    play_interval=1,  # Step as fast as possible, rendering is throttled by the components
 )
 page  # noqa
 
@@ -0,0 +1,304 @@
+"""
+Incremental rendering for the Boltzmann Wealth app
+==================================================
+
+Solara components that only send what changed to the browser. The space is drawn
+on a canvas that receives patches of changed cells, and the plot receives only
+the points appended since the last frame. Large grids are aggregated into blocks
+before diffing, and frames are throttled to a fixed FPS so the model can step
+faster than the UI redraws.
+"""
+
+import math
+import time
+from collections.abc import Callable
+
+import numpy as np
+import solara
+from matplotlib import colormaps
+from matplotlib.colors import to_hex
+from mesa.visualization.utils import update_counter
+
+
+def value_grid(model, attribute="wealth"):
+    """Return a (width, height) array with the mean attribute of the agents in each cell.
+
+    Like the matplotlib space, which colours each agent by its own value, a cell
+    shows the value of a typical agent in it. Empty cells are NaN and left blank.
+
+    Args:
+        model (Model): A model with a grid, either object based or BoltzmannWealthArray
+        attribute (str, optional): Agent attribute to average. Defaults to "wealth".
+    """
+    if hasattr(model, "cell_index"):
+        # Array-backed model: one array entry per agent
+        size = model.width * model.height
+        cells = model.cell_index()
+        sums = np.bincount(cells, weights=getattr(model, attribute), minlength=size)
+        counts = np.bincount(cells, minlength=size)
+        shape = (model.width, model.height)
+    else:
+        shape = (model.grid.width, model.grid.height)
+        sums, counts = np.zeros(shape), np.zeros(shape)
+        for agent in model.agents:
+            sums[agent.pos] += getattr(agent, attribute)
+            counts[agent.pos] += 1
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (sums / counts).reshape(shape)
+
+
+def block_size(width, height, max_cells):
+    """Return the side of the square blocks needed to fit a grid in max_cells cells."""
+    return max(1, math.ceil(math.sqrt(width * height / max_cells)))
+
+
+def downsample(grid, max_cells):
+    """Aggregate a grid into square blocks so that it has at most max_cells cells.
+
+    Each block holds the mean value of the non-empty cells it covers, and is
+    empty (NaN) if all of them are.
+
+    Args:
+        grid (np.ndarray): 2D array of cell values, NaN for empty cells
+        max_cells (int): Maximum number of cells to send to the browser
+    """
+    width, height = grid.shape
+    block = block_size(width, height, max_cells)
+    if block == 1:
+        return grid
+
+    # Pad with empty cells to a multiple of the block size
+    pad = ((0, -width % block), (0, -height % block))
+    blocks = np.pad(grid, pad, constant_values=np.nan).reshape(
+        (width + pad[0][1]) // block, block, (height + pad[1][1]) // block, block
+    )
+    filled = ~np.isnan(blocks)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(filled, blocks, 0).sum(axis=(1, 3)) / filled.sum(axis=(1, 3))
+
+
+class GridDiff:
+    """Turns successive grid frames into patches of cells whose color changed.
+
+    Empty (NaN) cells are sent with a null color and cleared by the canvas.
+    """
+
+    def __init__(self, cmap="viridis", vmin=0, vmax=10):
+        """Create a new differ.
+
+        Args:
+            cmap (str, optional): Matplotlib colormap name. Defaults to "viridis".
+            vmin (float, optional): Value mapped to the bottom of the colormap. Defaults to 0.
+            vmax (float, optional): Value mapped to the top of the colormap. Defaults to 10.
+        """
+        colormap = colormaps[cmap]
+        self.colors = [to_hex(colormap(i / 255)) for i in range(256)]
+        self.vmin = vmin
+        self.vmax = vmax
+        self.last = None
+        self.frame = 0
+
+    def reset(self):
+        """Forget the last frame, so the next patch redraws every cell."""
+        self.last = None
+
+    def update(self, grid):
+        """Return the patch that turns the last frame into this grid, or None if no cell changed."""
+        scaled = (grid - self.vmin) / (self.vmax - self.vmin) * 255
+        indices = np.clip(np.nan_to_num(scaled), 0, 255).astype(np.int16)
+        indices[np.isnan(grid)] = -1  # Empty cell
+
+        full = self.last is None or self.last.shape != indices.shape
+        if full:
+            xs, ys = np.indices(indices.shape).reshape(2, -1)
+        else:
+            xs, ys = np.nonzero(indices != self.last)
+        self.last = indices
+        if not full and len(xs) == 0:
+            return None
+        self.frame += 1
+
+        return {
+            "frame": self.frame,
+            "full": full,
+            "cells": [
+                [int(x), int(y), self.colors[indices[x, y]] if indices[x, y] >= 0 else None]
+                for x, y in zip(xs, ys)
+            ],
+        }
+
+
+class SeriesDiff:
+    """Turns a growing series into patches holding only the new points."""
+
+    def __init__(self):
+        self.sent = 0
+        self.frame = 0
+
+    def reset(self):
+        """Resend the whole series with the next patch."""
+        self.sent = 0
+
+    def update(self, values):
+        """Return the points appended to values since the last patch, or None if there are none."""
+        start = self.sent
+        if start > 0 and start == len(values):
+            return None
+        self.sent = len(values)
+        self.frame += 1
+        return {
+            "frame": self.frame,
+            "start": start,
+            "values": [float(value) for value in values[start:]],
+        }
+
+
+class FrameThrottle:
+    """Limits how often a component redraws, independently of the model step rate."""
+
+    def __init__(self, fps):
+        self.interval = 1 / fps
+        self.last = -math.inf
+
+    def ready(self):
+        """Return True (and start a new frame) if a frame interval has passed."""
+        now = time.perf_counter()
+        if now - self.last < self.interval:
+            return False
+        self.last = now
+        return True
+
+    def remaining(self):
+        """Seconds until the next frame may be drawn."""
+        return max(0.0, self.last + self.interval - time.perf_counter())
+
+
+@solara.component_vue("space_canvas.vue")
+def SpaceCanvas(
+    width: int,
+    height: int,
+    cell_size: int,
+    patch: dict,
+    event_request_full: Callable[[dict], None],
+):
+    pass
+
+
+@solara.component_vue("plot_canvas.vue")
+def PlotCanvas(
+    label: str,
+    width: int,
+    height: int,
+    patch: dict,
+    event_request_full: Callable[[dict], None],
+):
+    pass
+
+
+def use_throttled_frame(model, make_differ, render, fps):
+    """Shared frame logic of the incremental components.
+
+    Redraws at most fps times per second. A skipped frame schedules a trailing
+    redraw, so the last model state is always shown once the model pauses.
+
+    Returns:
+        tuple: The latest patch and a callback that requests a full redraw
+    """
+    step = update_counter.get()
+    tick, set_tick = solara.use_state(0)
+    state = solara.use_memo(
+        lambda: {"differ": make_differ(), "throttle": FrameThrottle(fps), "patch": None},
+        dependencies=[model],
+    )
+
+    pending = not state["throttle"].ready()
+    if not pending:
+        # Keep the previous patch when nothing changed, so nothing is sent
+        state["patch"] = render(state["differ"]) or state["patch"]
+
+    def trailing_frame():
+        if pending:
+            time.sleep(state["throttle"].remaining())
+            set_tick(lambda value: value + 1)
+
+    solara.use_thread(trailing_frame, dependencies=[model, step, tick])
+
+    def request_full(data=None):
+        state["differ"].reset()
+        state["throttle"].last = -math.inf
+        set_tick(lambda value: value + 1)
+
+    return state["patch"], request_full
+
+
+def make_incremental_space_component(
+    attribute="wealth", cmap="viridis", vmin=0, vmax=10, max_cells=128 * 128, fps=10, size=500
+):
+    """Create a space component that sends only changed cells to the browser.
+
+    Args:
+        attribute (str, optional): Agent attribute averaged per cell. Defaults to "wealth".
+        cmap (str, optional): Matplotlib colormap name. Defaults to "viridis".
+        vmin (float, optional): Lowest value of the colormap. Defaults to 0.
+        vmax (float, optional): Highest value of the colormap. Defaults to 10.
+        max_cells (int, optional): Grids above this size are aggregated into blocks. Defaults to 128 * 128.
+        fps (int, optional): Maximum frames per second. Defaults to 10.
+        size (int, optional): Canvas size in pixels. Defaults to 500.
+
+    Returns:
+        function: A function that creates an IncrementalSpace component.
+    """
+
+    @solara.component
+    def IncrementalSpace(model):
+        patch, request_full = use_throttled_frame(
+            model,
+            lambda: GridDiff(cmap, vmin, vmax),
+            lambda differ: differ.update(downsample(value_grid(model, attribute), max_cells)),
+            fps,
+        )
+        space = getattr(model, "grid", model)
+        block = block_size(space.width, space.height, max_cells)
+        width, height = math.ceil(space.width / block), math.ceil(space.height / block)
+        return SpaceCanvas(
+            width=width,
+            height=height,
+            cell_size=max(1, size // max(width, height)),
+            patch=patch,
+            event_request_full=request_full,
+        )
+
+    return IncrementalSpace
+
+
+def make_incremental_plot_component(measure, fps=10, width=500, height=300):
+    """Create a plot component that sends only newly collected points to the browser.
+
+    Args:
+        measure (str): Name of the model reporter to plot
+        fps (int, optional): Maximum frames per second. Defaults to 10.
+        width (int, optional): Canvas width in pixels. Defaults to 500.
+        height (int, optional): Canvas height in pixels. Defaults to 300.
+
+    Returns:
+        function: A function that creates an IncrementalPlot component.
+    """
+
+    @solara.component
+    def IncrementalPlot(model):
+        patch, request_full = use_throttled_frame(
+            model,
+            SeriesDiff,
+            lambda differ: differ.update(model.datacollector.model_vars[measure]),
+            fps,
+        )
+        return PlotCanvas(
+            label=measure,
+            width=width,
+            height=height,
+            patch=patch,
+            event_request_full=request_full,
+        )
+
+    return IncrementalPlot